@@ -1,14 +1,13 @@
 use std::fs::File;
-use std::path::PathBuf;
+use std::path::{Path, PathBuf};
 use std::env;
-use std::process::Command;
-use std::io::{self, Write};
+use std::process::{Command, Stdio};
+use std::io::{self, BufRead, BufReader, Cursor, Write};
 use std::fs;
 use std::os::unix::fs::PermissionsExt;
 
 use serde::{Serialize, Deserialize};
 use std::error::Error;
-use std::io::Read;
 
 #[derive(Debug, Serialize, Deserialize)]
 pub struct ShellConfig {
@@ -38,6 +37,29 @@ impl ShellConfig {
     }
 }
 
+// Look the shell up on disk rather than spawning it with --version //
+fn shell_exists(shell: &str) -> bool {
+    let is_executable = |path: &Path| {
+        fs::metadata(path)
+            .map(|metadata| metadata.is_file() && metadata.permissions().mode() & 0o111 != 0)
+            .unwrap_or(false)
+    };
+
+    if shell.contains('/') {
+        return is_executable(Path::new(shell));
+    }
+
+    env::var_os("PATH")
+        .map(|paths| env::split_paths(&paths).any(|dir| is_executable(&dir.join(shell))))
+        .unwrap_or(false)
+}
+
+fn is_nonempty_file(path: &Path) -> bool {
+    fs::metadata(path)
+        .map(|metadata| metadata.is_file() && metadata.len() > 0)
+        .unwrap_or(false)
+}
+
 pub fn detect_available_shells() -> Vec<(String, String)> {
     let mut shells = Vec::new();
     
@@ -53,7 +75,7 @@ pub fn detect_available_shells() -> Vec<(String, String)> {
     // Special case: Homebrew bash on macOS
     #[cfg(target_os = "macos")]
     {
-        if Command::new("/usr/local/bin/bash").arg("--version").output().is_ok() {
+        if shell_exists("/usr/local/bin/bash") {
             shells.push(("bash".to_string(), ".bashrc".to_string()));
         }
     }
@@ -66,7 +88,7 @@ pub fn detect_available_shells() -> Vec<(String, String)> {
             continue;
         }
 
-        if Command::new(shell).arg("--version").output().is_ok() {
+        if shell_exists(shell) {
             shells.push((shell.to_string(), config.to_string()));
         }
     }
@@ -75,7 +97,7 @@ pub fn detect_available_shells() -> Vec<(String, String)> {
     #[cfg(target_os = "macos")]
     {
         // Check for system bash if we haven't found any yet
-        if shells.is_empty() && Command::new("/bin/bash").arg("--version").output().is_ok() {
+        if shells.is_empty() && shell_exists("/bin/bash") {
             shells.push(("bash".to_string(), ".bashrc".to_string()));
         }
     }
@@ -155,7 +177,16 @@ pub fn get_shell_config() -> ShellConfig {
     }
 }
 
-pub fn get_shell_history() -> Result<String, Box<dyn Error>> {
+// Parse fish history format (- cmd: <command>), borrowing each command instead of copying it twice
+fn parse_fish_history(history: &str) -> String {
+    history.lines()
+        .filter_map(|line| line.strip_prefix("- cmd: "))
+        .collect::<Vec<&str>>()
+        .join("\n")
+}
+
+// History files are streamed; only fish history and shell output are held as text
+pub fn get_shell_history() -> Result<Box<dyn BufRead>, Box<dyn Error>> {
     let config = get_shell_config();
     let home = env::var("HOME")?;
     
@@ -177,8 +208,8 @@ pub fn get_shell_history() -> Result<String, Box<dyn Error>> {
         "ksh" => PathBuf::from(&home).join(".sh_history"),
         _ => PathBuf::from(&home).join(".bash_history"), // fallback
     };
-    
-    // Check and fix permissions on macOS
+
+    // Check and fix permissions on macOS (only on the shell's own history file, never on a HISTFILE path)
     #[cfg(target_os = "macos")]
     {
         if let Ok(metadata) = fs::metadata(&history_path) {
@@ -190,31 +221,27 @@ pub fn get_shell_history() -> Result<String, Box<dyn Error>> {
         }
     }
 
+    // An exported HISTFILE points at the real history, which saves spawning the shell to find it.
+    // Only a non-empty regular file counts, since HISTFILE=/dev/null is a common way to turn history off
+    // (fish ignores HISTFILE)
+    let history_path = match env::var_os("HISTFILE") {
+        Some(histfile) if config.shell_type != "fish" && is_nonempty_file(Path::new(&histfile)) => {
+            PathBuf::from(histfile)
+        },
+        _ => history_path,
+    };
+
     // Special handling for fish history format
     if config.shell_type == "fish" {
-        if let Ok(mut file) = File::open(&history_path) {
-            let mut contents = String::new();
-            file.read_to_string(&mut contents)?;
+        if let Ok(contents) = fs::read(&history_path) {
             if !contents.is_empty() {
-                // Parse fish history format (cmd: <command>)
-                let commands: Vec<String> = contents.lines()
-                    .filter_map(|line| {
-                        if line.starts_with("- cmd: ") {
-                            Some(line[7..].to_string())
-                        } else {
-                            None
-                        }
-                    })
-                    .collect();
-                return Ok(commands.join("\n"));
+                return Ok(Box::new(Cursor::new(parse_fish_history(&String::from_utf8_lossy(&contents)))));
             }
         }
-    } else if let Ok(mut file) = File::open(&history_path) {
-        // Standard handling for other shells
-        let mut contents = String::new();
-        file.read_to_string(&mut contents)?;
-        if !contents.is_empty() {
-            return Ok(contents);
+    } else if is_nonempty_file(&history_path) {
+        // Standard handling for other shells: lines are read and decoded as they are parsed
+        if let Ok(file) = File::open(&history_path) {
+            return Ok(Box::new(BufReader::with_capacity(super::HISTORY_BUFFER_SIZE, file)));
         }
     }
     
@@ -227,29 +254,24 @@ pub fn get_shell_history() -> Result<String, Box<dyn Error>> {
         _ => "history -r; history", // bash/zsh default
     };
     
+    // Only stdout is read, so don't buffer the interactive shell's stderr chatter //
     match Command::new(&config.shell_type)
         .arg("-i")
         .arg("-c")
         .arg(history_command)
+        .stderr(Stdio::null())
         .output() {
         Ok(output) if output.status.success() => {
-            let mut history = String::from_utf8(output.stdout)?;
+            // Decode in place when valid, replacing stray bytes instead of failing //
+            let mut history = String::from_utf8(output.stdout)
+                .unwrap_or_else(|e| String::from_utf8_lossy(e.as_bytes()).into_owned());
             
             // Clean up fish history output if needed
             if config.shell_type == "fish" {
-                history = history.lines()
-                    .filter_map(|line| {
-                        if line.starts_with("- cmd: ") {
-                            Some(line[7..].to_string())
-                        } else {
-                            None
-                        }
-                    })
-                    .collect::<Vec<String>>()
-                    .join("\n");
+                history = parse_fish_history(&history);
             }
             
-            Ok(history)
+            Ok(Box::new(Cursor::new(history)))
         },
         _ => Err("Could not retrieve shell history".into())
     }
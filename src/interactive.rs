@@ -1,3 +1,4 @@
+use std::collections::HashSet;
 use std::io;
 use termion::event::Key;
 use termion::input::TermRead;
@@ -20,21 +21,32 @@ pub fn interactive_search(commands: &[String]) -> Option<String> {
     let mut selected = 0;
     
     // Create a vector of unique commands in reverse order (most recent first) //
+    let mut seen = HashSet::new();
     let mut unique_commands = Vec::new();
     for cmd in commands.iter().rev() {
-        if !unique_commands.iter().any(|x| *x == cmd) {
+        if seen.insert(cmd) {
             unique_commands.push(cmd);
         }
     }
     let mut filtered_commands: Vec<&String> = unique_commands.clone();
 
+    // Lowercase every command once here rather than on each keystroke //
+    let lowercase_commands: Vec<String> = unique_commands.iter().map(|cmd| cmd.to_lowercase()).collect();
+
+    let mut input_changed = false;
+
     loop {
-        // Filter commands based on input //
-        filtered_commands = unique_commands
-            .iter()
-            .filter(|cmd| cmd.to_lowercase().contains(&input.to_lowercase()))
-            .copied()
-            .collect();
+        // Filter commands based on input, only when it changed (moving the selection reuses the last result) //
+        if input_changed {
+            let input_lower = input.to_lowercase();
+            filtered_commands = unique_commands
+                .iter()
+                .zip(&lowercase_commands)
+                .filter(|(_, cmd_lower)| cmd_lower.contains(&input_lower))
+                .map(|(cmd, _)| *cmd)
+                .collect();
+            input_changed = false;
+        }
 
         // Limit to 30 most recent matches (temp for now) //
         let display_commands = filtered_commands.iter().take(30).collect::<Vec<_>>();
@@ -88,11 +100,13 @@ pub fn interactive_search(commands: &[String]) -> Option<String> {
                 Key::Char(c) => {
                     // Add character to search //
                     input.push(c);
+                    input_changed = true;
                     selected = 0;
                 }
                 Key::Backspace => {
                     // Remove last character //
                     input.pop();
+                    input_changed = true;
                     selected = 0;
                 }
                 Key::Up => {
@@ -1,10 +1,11 @@
-use std::collections::{HashMap, HashSet};
+use std::collections::HashMap;
 use std::error::Error;
 use std::fs::File;
-use std::io::Read;
+use std::io::{self, BufRead, BufReader};
 use std::path::Path;
 use std::env;
 use regex::Regex;
+use aho_corasick::{AhoCorasick, AhoCorasickKind};
 use serde_json::json;
 use clap::{Arg, App, ArgMatches, AppSettings};
 use thousands::Separable;
@@ -16,67 +17,131 @@ use interactive::interactive_search;
 
 mod search;
 use search::{
-    search_commands_by_keyword, search_words_by_keyword, search_by_category,
+    build_search_regex, search_commands_by_keyword, search_words_by_keyword, search_by_category,
     print_keyword_search_results, print_category_search_results
 };
 
 mod config;
 use config::get_shell_history;
 
+// Read buffer for history files, which can run to several megabytes //
+const HISTORY_BUFFER_SIZE: usize = 1 << 16;
+
 // Should probably make this a database at some point //
+static NAV_COMMANDS: &[&str] = &["cd ", "ls", "pwd", "dir", "pushd", "popd", "ll", "tree", "exa", "fd", "ranger", "nnn", "lf"];
+static FILE_OPS: &[&str] = &["cp ", "mv ", "rm ", "mkdir", "touch", "chmod", "chown", "ln ", "rsync", "tar ", 
+                             "gzip", "gunzip", "zip", "unzip", "7z", "rename", "trash", "shred"];
+static EDITORS: &[&str] = &["vim ", "nano ", "emacs", "code ", "subl ", "gedit", "pico", "vi", "micro", "kate", 
+                            "atom", "neovim", "nano", "ed", "sed ", "awk "];
+static VCS: &[&str] = &["git ", "hg ", "svn ", "fossil", "bzr", "cvs", "darcs", "git-lfs", "git-flow"];
+static PACKAGE_MANAGERS: &[&str] = &["apt", "yum", "dnf", "pacman", "brew", "pip ", "npm ", "snap", "flatpak", 
+                                     "zypper", "port", "apk", "dpkg", "rpm", "gem", "cargo", "go ", "dotnet"];
+static SYSTEM_MONITORS: &[&str] = &["top", "htop", "ps ", "kill", "df ", "du ", "free", "btop", "glances", "nmon", 
+                                    "iotop", "iftop", "nethogs", "vmstat", "iostat", "dstat", "sar", "mpstat", "pidstat"];
+static NETWORK_COMMANDS: &[&str] = &["ssh ", "scp ", "ping", "curl", "wget", "ifconfig", "ip ", "sftp", "ftp", "telnet", 
+                                     "netstat", "ss", "traceroute", "tracepath", "mtr", "dig", "nslookup", "nmcli", "iwconfig"];
+static DATABASES: &[&str] = &["mysql", "psql", "sqlite3", "mongo", "redis-cli", "sqlcmd", "clickhouse-client", 
+                              "influx", "cqlsh", "neo4j", "arangosh", "cockroach sql"];
+static CONTAINERS: &[&str] = &["docker ", "podman", "kubectl", "oc ", "ctr", "nerdctl", "lxc", "lxd", "vagrant", 
+                               "virsh", "qemu", "lima", "colima"];
+static SHELL_BUILTINS: &[&str] = &["export", "source", "alias", "echo", "printf", "read", "set", "unset", "type", 
+                                   "hash", "history", "fc", "jobs", "bg", "fg", "wait", "times", "trap", "clear"];
+
+static LANGUAGES: &[(&str, &[&str])] = &[
+    ("Rust", &[
+        "cargo", "rustc", "rustup", "rustfmt", "clippy", 
+        "cargo build", "cargo run", "cargo test", "cargo check",
+        "cargo clippy", "cargo fmt", "cargo doc", "cargo add",
+        "cargo update", "cargo install", "cargo publish",
+        "cargo tree", "cargo metadata", "cargo audit",
+        "cargo deny", "cargo expand", "cargo vendor"
+    ]),
+    ("Python", &["python", "pip", "py ", "python3", "python2", "pylint", "pyflakes", "mypy", "black", "snakemake"]),
+    ("Java", &["java ", "javac", "mvn ", "gradle", "ant ", "jbang", "groovy"]),
+    ("C/C++", &["gcc", "g++", "clang", "^make ","$make", "cmake", "ninja", "gdb", "lldb", "valgrind", "cpp"]),
+    ("C#", &["dotnet", "mono", "msbuild", "csc"]),
+    ("JavaScript", &["node ", "npm ", "yarn", "deno", "tsc", "bun"]),
+    ("Go", &[" go ","^go","$go", "gofmt", "golangci-lint"]),
+    ("Ruby", &["ruby ", "gem ", "rake", "bundle"]),
+    ("PHP", &["php ", "composer", "phpunit"]),
+    ("Shell", &["bash ", "sh ", "zsh ", "fish ", "dash", "ksh"]),
+    ("Assembly", &["as ", "nasm", "yasm", "objdump", "gdb"]),
+    ("R", &["r ", "rscript", "radian"]),
+    ("Perl", &["perl ", "cpan"]),
+    ("Haskell", &["ghc", "ghci", "stack", "cabal"]),
+    ("Lua", &["lua ", "luac"]),
+    ("Dart", &["dart ", "flutter"]),
+    ("Scala", &["scala ", "scalac"]),
+    ("Kotlin", &["kotlin", "kotlinc"]),
+    ("Swift", &["swift ", "swiftc"]),
+];
+
 lazy_static! {
-    static ref NAV_COMMANDS: Vec<&'static str> = vec!["cd ", "ls", "pwd", "dir", "pushd", "popd", "ll", "tree", "exa", "fd", "ranger", "nnn", "lf"];
-    static ref FILE_OPS: Vec<&'static str> = vec!["cp ", "mv ", "rm ", "mkdir", "touch", "chmod", "chown", "ln ", "rsync", "tar ", 
-                   "gzip", "gunzip", "zip", "unzip", "7z", "rename", "trash", "shred"];
-    static ref EDITORS: Vec<&'static str> = vec!["vim ", "nano ", "emacs", "code ", "subl ", "gedit", "pico", "vi", "micro", "kate", 
-                  "atom", "neovim", "nano", "ed", "sed ", "awk "];
-    static ref VCS: Vec<&'static str> = vec!["git ", "hg ", "svn ", "fossil", "bzr", "cvs", "darcs", "git-lfs", "git-flow"];
-    static ref PACKAGE_MANAGERS: Vec<&'static str> = vec!["apt", "yum", "dnf", "pacman", "brew", "pip ", "npm ", "snap", "flatpak", 
-                           "zypper", "port", "apk", "dpkg", "rpm", "gem", "cargo", "go ", "dotnet"];
-    static ref SYSTEM_MONITORS: Vec<&'static str> = vec!["top", "htop", "ps ", "kill", "df ", "du ", "free", "btop", "glances", "nmon", 
-                         "iotop", "iftop", "nethogs", "vmstat", "iostat", "dstat", "sar", "mpstat", "pidstat"];
-    static ref NETWORK_COMMANDS: Vec<&'static str> = vec!["ssh ", "scp ", "ping", "curl", "wget", "ifconfig", "ip ", "sftp", "ftp", "telnet", 
-                           "netstat", "ss", "traceroute", "tracepath", "mtr", "dig", "nslookup", "nmcli", "iwconfig"];
-    static ref DATABASES: Vec<&'static str> = vec!["mysql", "psql", "sqlite3", "mongo", "redis-cli", "sqlcmd", "clickhouse-client", 
-                    "influx", "cqlsh", "neo4j", "arangosh", "cockroach sql"];
-    static ref CONTAINERS: Vec<&'static str> = vec!["docker ", "podman", "kubectl", "oc ", "ctr", "nerdctl", "lxc", "lxd", "vagrant", 
-                     "virsh", "qemu", "lima", "colima"];
-    static ref SHELL_BUILTINS: Vec<&'static str> = vec!["export", "source", "alias", "echo", "printf", "read", "set", "unset", "type", 
-                         "hash", "history", "fc", "jobs", "bg", "fg", "wait", "times", "trap", "clear"];
-    
-    static ref LANGUAGES: Vec<(&'static str, Vec<&'static str>)> = vec![
-        ("Rust", vec![
-            "cargo", "rustc", "rustup", "rustfmt", "clippy", 
-            "cargo build", "cargo run", "cargo test", "cargo check",
-            "cargo clippy", "cargo fmt", "cargo doc", "cargo add",
-            "cargo update", "cargo install", "cargo publish",
-            "cargo tree", "cargo metadata", "cargo audit",
-            "cargo deny", "cargo expand", "cargo vendor"
-        ]),
-        ("Python", vec!["python", "pip", "py ", "python3", "python2", "pylint", "pyflakes", "mypy", "black", "snakemake"]),
-        ("Java", vec!["java ", "javac", "mvn ", "gradle", "ant ", "jbang", "groovy"]),
-        ("C/C++", vec!["gcc", "g++", "clang", "^make ","$make", "cmake", "ninja", "gdb", "lldb", "valgrind", "cpp"]),
-        ("C#", vec!["dotnet", "mono", "msbuild", "csc"]),
-        ("JavaScript", vec!["node ", "npm ", "yarn", "deno", "tsc", "bun"]),
-        ("Go", vec![" go ","^go","$go", "gofmt", "golangci-lint"]),
-        ("Ruby", vec!["ruby ", "gem ", "rake", "bundle"]),
-        ("PHP", vec!["php ", "composer", "phpunit"]),
-        ("Shell", vec!["bash ", "sh ", "zsh ", "fish ", "dash", "ksh"]),
-        ("Assembly", vec!["as ", "nasm", "yasm", "objdump", "gdb"]),
-        ("R", vec!["r ", "rscript", "radian"]),
-        ("Perl", vec!["perl ", "cpan"]),
-        ("Haskell", vec!["ghc", "ghci", "stack", "cabal"]),
-        ("Lua", vec!["lua ", "luac"]),
-        ("Dart", vec!["dart ", "flutter"]),
-        ("Scala", vec!["scala ", "scalac"]),
-        ("Kotlin", vec!["kotlin", "kotlinc"]),
-        ("Swift", vec!["swift ", "swiftc"]),
-    ];
+    // Category names in report order, paired with their keywords //
+    static ref CATEGORY_KEYWORDS: Vec<(String, &'static [&'static str])> = {
+        let mut categories: Vec<(String, &'static [&'static str])> = vec![
+            ("Navigation".to_string(), NAV_COMMANDS),
+            ("File Ops".to_string(), FILE_OPS),
+            ("Editors".to_string(), EDITORS),
+            ("Version Ctrl".to_string(), VCS),
+            ("Pkg Mgmt".to_string(), PACKAGE_MANAGERS),
+            ("Sys Monitor".to_string(), SYSTEM_MONITORS),
+            ("Network".to_string(), NETWORK_COMMANDS),
+            ("Databases".to_string(), DATABASES),
+            ("Containers".to_string(), CONTAINERS),
+            ("Shell Builtins".to_string(), SHELL_BUILTINS),
+        ];
+        for (lang, keywords) in LANGUAGES.iter() {
+            categories.push((format!("Lang: {}", lang), *keywords));
+        }
+        categories
+    };
+
+    // One automaton over every keyword, so a single scan finds all categories of a command.
+    // Each keyword maps to a bitmask of the categories listing it (bit i = CATEGORY_KEYWORDS[i]),
+    // so shared keywords like "cargo" are added once //
+    static ref CATEGORY_MATCHER: (AhoCorasick, Vec<u64>) = {
+        assert!(CATEGORY_KEYWORDS.len() <= 64, "category bitmask holds at most 64 categories");
+        let mut keywords: Vec<&'static str> = Vec::new();
+        let mut keyword_categories: Vec<u64> = Vec::new();
+        for (index, (_, category_keywords)) in CATEGORY_KEYWORDS.iter().enumerate() {
+            let bit = 1u64 << index;
+            for &keyword in category_keywords.iter() {
+                match keywords.iter().position(|&k| k == keyword) {
+                    Some(pos) => keyword_categories[pos] |= bit,
+                    None => {
+                        keywords.push(keyword);
+                        keyword_categories.push(bit);
+                    }
+                }
+            }
+        }
+        // A few hundred short keywords make a small DFA: one table lookup per input byte //
+        let matcher = AhoCorasick::builder()
+            .ascii_case_insensitive(true)
+            .kind(Some(AhoCorasickKind::DFA))
+            .build(&keywords)
+            .unwrap();
+        (matcher, keyword_categories)
+    };
+
+    // Either a "#<timestamp>" comment or a "  <n>  " line number from `history` output //
+    static ref LINE_PREFIX_RE: Regex = Regex::new(r"^(?:#\d|\s*\d+\s+)").unwrap();
+    static ref TOKEN_RE: Regex = Regex::new(r#"(?:[^\s,"]|"(?:\\.|[^"])*")+"#).unwrap();
 }
 
 fn optimized_levenshtein(a: &str, b: &str) -> usize {
+    // Nearly all history is ASCII, where bytes are chars and no decoding or copying is needed //
+    if a.is_ascii() && b.is_ascii() {
+        return levenshtein_distance(a.as_bytes(), b.as_bytes());
+    }
+
     let a_chars: Vec<_> = a.chars().collect();
     let b_chars: Vec<_> = b.chars().collect();
+    levenshtein_distance(&a_chars, &b_chars)
+}
+
+fn levenshtein_distance<T: PartialEq>(a_chars: &[T], b_chars: &[T]) -> usize {
     let a_len = a_chars.len();
     let b_len = b_chars.len();
 
@@ -123,12 +188,13 @@ fn optimized_levenshtein(a: &str, b: &str) -> usize {
     prev_row[b_len]
 }
 
-fn find_potential_mistypes(commands: &[String], command_frequency: &HashMap<&String, usize>) -> usize {
+fn find_potential_mistypes(command_frequency: &HashMap<&String, usize>) -> usize {
     let unique_commands: Vec<&String> = command_frequency.keys().copied().collect();
     let mut mistyped_count = 0;
 
-    for cmd in commands {
-        if command_frequency.get(cmd).copied().unwrap_or(0) > 1 {
+    // Only commands run exactly once can be mistypes, and each of those has a single entry //
+    for (&cmd, &count) in command_frequency {
+        if count > 1 {
             continue;
         }
 
@@ -163,140 +229,177 @@ fn find_potential_mistypes(commands: &[String], command_frequency: &HashMap<&Str
     mistyped_count
 }
 
-fn process_bash_history(history_text: &str) -> (Vec<String>, Vec<String>) {
-    if history_text.is_empty() {
-        return (Vec::new(), Vec::new());
-    }
-
-    let lines: Vec<&str> = history_text.lines().filter(|line| !line.trim().is_empty()).collect();
+fn process_bash_history<R: BufRead>(mut history: R, extract_keywords: bool) -> io::Result<(Vec<String>, Vec<String>)> {
     let mut commands = Vec::new();
-    let num_re = Regex::new(r"^\s*\d+\s+").unwrap();
-    let comment_re = Regex::new(r"^#\d+").unwrap();
+    let mut words = Vec::new();
+    let mut buf = Vec::new();
 
-    for line in lines {
-        let command = if num_re.is_match(line) {
-            num_re.replace(line, "").into_owned()
-        } else if comment_re.is_match(line) {
-            continue;
-        } else if line.starts_with(':') && line.contains(';') {
-            match line.splitn(3, ';').nth(2) {
-                Some(cmd) => cmd.to_string(),
-                None => continue,
-            }
-        } else {
-            line.to_string()
-        };
-        commands.push(command.trim().to_string());
-    }
+    // Stream the history one line at a time so the whole file is never held in memory //
+    loop {
+        buf.clear();
+        if history.read_until(b'\n', &mut buf)? == 0 {
+            break;
+        }
 
-    let mut words = Vec::new();
-    let token_re = Regex::new(r#"(?:[^\s,"]|"(?:\\.|[^"])*")+"#).unwrap();
+        let line = String::from_utf8_lossy(&buf);
+        let line = match line.strip_suffix('\n') {
+            Some(line) => line.strip_suffix('\r').unwrap_or(line),
+            None => &line,
+        };
+        if line.trim().is_empty() {
+            continue;
+        }
 
-    for cmd in &commands {
-        for token in token_re.find_iter(cmd) {
-            let token = token.as_str();
-            if token.starts_with('-') {
-                continue;
+        // One regex call tells a timestamp line from a numbered one; numbers are sliced off //
+        let command = match LINE_PREFIX_RE.find(line) {
+            Some(prefix) if prefix.as_str().starts_with('#') => continue,
+            Some(prefix) => &line[prefix.end()..],
+            None if line.starts_with(':') && line.contains(';') => {
+                match line.splitn(3, ';').nth(2) {
+                    Some(cmd) => cmd,
+                    None => continue,
+                }
             }
-            let cleaned_token = token.trim_matches(|c| c == '"' || c == '\'').to_lowercase();
-            if !cleaned_token.is_empty() && !cleaned_token.chars().all(|c| c.is_ascii_digit()) {
-                words.push(cleaned_token);
+            None => line,
+        };
+        let command = command.trim();
+
+        // Interactive search only lists commands, so it skips keyword extraction entirely //
+        if extract_keywords {
+            // Extract keywords while the command is at hand instead of in a second pass.
+            // ASCII commands (nearly all of them) lowercase with a plain byte map //
+            let cmd_lower = if command.is_ascii() {
+                command.to_ascii_lowercase()
+            } else {
+                command.to_lowercase()
+            };
+            // Only quoted strings need the regex; without a '"' its tokens are just the
+            // runs between whitespace and commas //
+            if cmd_lower.contains('"') {
+                for token in TOKEN_RE.find_iter(&cmd_lower) {
+                    push_keyword(&mut words, token.as_str());
+                }
+            } else {
+                for token in cmd_lower.split(|c: char| c.is_whitespace() || c == ',') {
+                    push_keyword(&mut words, token);
+                }
             }
         }
+
+        commands.push(command.to_string());
     }
 
-    (commands, words)
+    Ok((commands, words))
 }
 
-fn categorize_command(cmd: &str) -> Vec<String> {
-    let cmd_lower = cmd.to_lowercase();
-    let mut categories = Vec::new();
-
-    if NAV_COMMANDS.iter().any(|&x| cmd_lower.contains(x)) {
-        categories.push("Navigation".to_string());
-    }
-    if FILE_OPS.iter().any(|&x| cmd_lower.contains(x)) {
-        categories.push("File Ops".to_string());
-    }
-    if EDITORS.iter().any(|&x| cmd_lower.contains(x)) {
-        categories.push("Editors".to_string());
-    }
-    if VCS.iter().any(|&x| cmd_lower.contains(x)) {
-        categories.push("Version Ctrl".to_string());
-    }
-    if PACKAGE_MANAGERS.iter().any(|&x| cmd_lower.contains(x)) {
-        categories.push("Pkg Mgmt".to_string());
-    }
-    if SYSTEM_MONITORS.iter().any(|&x| cmd_lower.contains(x)) {
-        categories.push("Sys Monitor".to_string());
-    }
-    if NETWORK_COMMANDS.iter().any(|&x| cmd_lower.contains(x)) {
-        categories.push("Network".to_string());
-    }
-    if DATABASES.iter().any(|&x| cmd_lower.contains(x)) {
-        categories.push("Databases".to_string());
-    }
-    if CONTAINERS.iter().any(|&x| cmd_lower.contains(x)) {
-        categories.push("Containers".to_string());
+fn push_keyword(words: &mut Vec<String>, token: &str) {
+    if token.starts_with('-') {
+        return;
     }
-    if SHELL_BUILTINS.iter().any(|&x| cmd_lower.contains(x)) {
-        categories.push("Shell Builtins".to_string());
+    // Filter on the borrowed slice so rejected tokens are never allocated //
+    let cleaned_token = token.trim_matches(|c| c == '"' || c == '\'');
+    if cleaned_token.is_empty() || cleaned_token.bytes().all(|b| b.is_ascii_digit()) {
+        return;
     }
+    words.push(cleaned_token.to_string());
+}
 
-    for (lang, keywords) in LANGUAGES.iter() {
-        if keywords.iter().any(|&x| cmd_lower.contains(x)) {
-            categories.push(format!("Lang: {}", lang));
-        }
+fn categorize_command(cmd: &str) -> Vec<&'static str> {
+    let (matcher, keyword_categories) = &*CATEGORY_MATCHER;
+    let mut matched = 0u64;
+
+    // Keywords are lowercase ASCII and the matcher ignores ASCII case, so only
+    // commands with non-ASCII text need a full Unicode lowercase copy //
+    let cmd_lower;
+    let haystack = if cmd.is_ascii() {
+        cmd
+    } else {
+        cmd_lower = cmd.to_lowercase();
+        &cmd_lower
+    };
+
+    for keyword in matcher.find_overlapping_iter(haystack) {
+        matched |= keyword_categories[keyword.pattern().as_usize()];
     }
 
+    let mut categories: Vec<&'static str> = CATEGORY_KEYWORDS.iter()
+        .enumerate()
+        .filter(|(index, _)| matched & (1u64 << index) != 0)
+        .map(|(_, (category, _))| category.as_str())
+        .collect();
+
     if categories.is_empty() {
-        categories.push("Other".to_string());
+        categories.push("Other");
     }
     
     categories
 }
 
-fn print_brief_stats(commands: &[String], words: &[String]) {
-    let unique_commands = commands.iter().collect::<HashSet<_>>().len();
-    let unique_words = words.iter().collect::<HashSet<_>>().len();
+// Tally how often each distinct string occurs //
+fn count_occurrences(items: &[String]) -> HashMap<&String, usize> {
+    let mut counts = HashMap::new();
+    for item in items {
+        *counts.entry(item).or_insert(0) += 1;
+    }
+    counts
+}
+
+// Highest `n` counts in descending order, selecting them before sorting so the long tail is never sorted //
+fn top_counts<K>(counts: impl IntoIterator<Item = (K, usize)>, n: usize) -> Vec<(K, usize)> {
+    let mut counts: Vec<(K, usize)> = counts.into_iter().collect();
+    if counts.len() > n {
+        counts.select_nth_unstable_by(n, |a, b| b.1.cmp(&a.1));
+        counts.truncate(n);
+    }
+    counts.sort_unstable_by(|a, b| b.1.cmp(&a.1));
+    counts
+}
+
+// Average, shortest and longest command length, gathered in one pass //
+fn command_length_stats(commands: &[String]) -> (f64, usize, usize) {
+    let (total, min, max) = commands.iter().fold((0, usize::MAX, 0), |(total, min, max), cmd| {
+        let len = cmd.len();
+        (total + len, min.min(len), max.max(len))
+    });
+    let min = if commands.is_empty() { 0 } else { min };
+    (total as f64 / commands.len() as f64, min, max)
+}
+
+fn print_brief_stats(
+    commands: &[String],
+    words: &[String],
+    command_counts: &HashMap<&String, usize>,
+    word_counts: &HashMap<&String, usize>
+) {
+    let unique_commands = command_counts.len();
+    let unique_words = word_counts.len();
     
     println!("Commands: {} ({} unique)", commands.len(), unique_commands);
     println!("Keywords: {} ({} unique)", words.len(), unique_words);
     
-    let avg_len = commands.iter().map(|c| c.len()).sum::<usize>() as f64 / commands.len() as f64;
-    let max_len = commands.iter().map(|c| c.len()).max().unwrap_or(0);
-    let min_len = commands.iter().map(|c| c.len()).min().unwrap_or(0);
+    let (avg_len, min_len, max_len) = command_length_stats(commands);
     
     println!("Command length: avg {:.1}, min {}, max {}", avg_len, min_len, max_len);
 }
 
-fn print_detailed_analysis(commands: &[String], words: &[String], category_counts: &HashMap<String, usize>) {
+fn print_detailed_analysis(
+    commands: &[String],
+    words: &[String],
+    command_frequency: &HashMap<&String, usize>,
+    word_counts: &HashMap<&String, usize>,
+    category_counts: &HashMap<&str, usize>
+) {
     let total_commands = commands.len();
-    let unique_commands = commands.iter().collect::<HashSet<_>>().len();
+    let unique_commands = command_frequency.len();
     let total_words = words.len();
-    let unique_words = words.iter().collect::<HashSet<_>>().len();
+    let unique_words = word_counts.len();
     
-    let cmd_lengths: Vec<usize> = commands.iter().map(|c| c.len()).collect();
-    let avg_length = cmd_lengths.iter().sum::<usize>() as f64 / total_commands as f64;
-    let max_length = *cmd_lengths.iter().max().unwrap_or(&0);
-    let min_length = *cmd_lengths.iter().min().unwrap_or(&0);
+    let (avg_length, min_length, max_length) = command_length_stats(commands);
     
-    let command_frequency: HashMap<&String, usize> = commands.iter().fold(HashMap::new(), |mut acc, cmd| {
-        *acc.entry(cmd).or_insert(0) += 1;
-        acc
-    });
-    let mistyped_count = find_potential_mistypes(commands, &command_frequency);
+    let mistyped_count = find_potential_mistypes(command_frequency);
     let mistyped_percentage = (mistyped_count as f64 / total_commands as f64) * 100.0;
     
-    let mut word_counts = HashMap::new();
-    for word in words {
-        *word_counts.entry(word.clone()).or_insert(0) += 1;
-    }
-    let top_words: Vec<_> = {
-        let mut v: Vec<_> = word_counts.into_iter().collect();
-        v.sort_by(|a, b| b.1.cmp(&a.1));
-        v.into_iter().take(5).collect()
-    };
+    let top_words = top_counts(word_counts.iter().map(|(word, count)| (*word, *count)), 5);
     
     println!("\n\x1b[1;34m=== DETAILED ANALYSIS ===\x1b[0m");
     
@@ -321,7 +424,7 @@ fn print_detailed_analysis(commands: &[String], words: &[String], category_count
     println!("\n\x1b[1mCategory Distribution:\x1b[0m");
     let total_categories: usize = category_counts.values().sum();
     let mut sorted_categories: Vec<_> = category_counts.iter().collect();
-    sorted_categories.sort_by(|a, b| b.1.cmp(a.1));
+    sorted_categories.sort_unstable_by(|a, b| b.1.cmp(a.1));
     
     for (category, count) in sorted_categories {
         let percentage = (*count as f64 / total_categories as f64) * 100.0;
@@ -334,11 +437,17 @@ fn print_detailed_analysis(commands: &[String], words: &[String], category_count
     }
 }
 
-fn print_bare_stats(commands: &[String], words: &[String], category_counts: &HashMap<String, usize>) {
+fn print_bare_stats(
+    commands: &[String],
+    words: &[String],
+    command_counts: &HashMap<&String, usize>,
+    word_counts: &HashMap<&String, usize>,
+    category_counts: &HashMap<&str, usize>
+) {
     let total_commands = commands.len();
-    let unique_commands = commands.iter().collect::<HashSet<_>>().len();
+    let unique_commands = command_counts.len();
     let total_words = words.len();
-    let unique_words = words.iter().collect::<HashSet<_>>().len();
+    let unique_words = word_counts.len();
 
     println!("COMMAND STATISTICS");
     println!("------------------");
@@ -349,41 +458,39 @@ fn print_bare_stats(commands: &[String], words: &[String], category_counts: &Has
     println!("Unique keywords: {}", unique_words);
     println!("Keyword variety: {:.1}%", (unique_words as f64 / total_words as f64) * 100.0);
     
-    let cmd_lengths: Vec<usize> = commands.iter().map(|c| c.len()).collect();
-    let avg_length = cmd_lengths.iter().sum::<usize>() as f64 / total_commands as f64;
+    let (avg_length, _, _) = command_length_stats(commands);
     println!("Avg command length: {:.1} chars", avg_length);
     
     println!("\nTOP CATEGORIES:");
-    let mut sorted_categories: Vec<_> = category_counts.iter().collect();
-    sorted_categories.sort_by(|a, b| b.1.cmp(a.1));
-    for (category, count) in sorted_categories.iter().take(5) {
+    let top_categories = top_counts(category_counts.iter().map(|(category, count)| (category, *count)), 5);
+    for (category, count) in top_categories {
         println!("{}: {}", category, count);
     }
 }
 
-fn print_boxed_stats(commands: &[String], words: &[String]) {
+fn print_boxed_stats(
+    commands: &[String],
+    words: &[String],
+    command_counts: &HashMap<&String, usize>,
+    word_counts: &HashMap<&String, usize>
+) {
     let total_commands = commands.len();
-    let unique_commands = commands.iter().collect::<HashSet<_>>().len();
+    let unique_commands = command_counts.len();
     let total_words = words.len();
-    let unique_words = words.iter().collect::<HashSet<_>>().len();
-
-    let stats = vec![
-        "╔════════════════════════════════════════════╗".to_string(),
-        "║               COMMAND PAST                ║".to_string(),
-        "╟────────────────────────────────────────────╢".to_string(),
-        format!("║ {:<20} {:>12} ║", "Total commands:", total_commands.separate_with_commas()),
-        format!("║ {:<20} {:>12} ║", "Unique commands:", unique_commands.separate_with_commas()),
-        format!("║ {:<20} {:>12.1}% ║", "Command variety:", (unique_commands as f64 / total_commands as f64) * 100.0),
-        "╟────────────────────────────────────────────╢".to_string(),
-        format!("║ {:<20} {:>12} ║", "Total keywords:", total_words.separate_with_commas()),
-        format!("║ {:<20} {:>12} ║", "Unique keywords:", unique_words.separate_with_commas()),
-        format!("║ {:<20} {:>12.1}% ║", "Keyword variety:", (unique_words as f64 / total_words as f64) * 100.0),
-        "╚════════════════════════════════════════════╝".to_string(),
-    ];
-
-    for line in stats {
-        println!("{}", line);
-    }
+    let unique_words = word_counts.len();
+
+    // Border lines are printed as-is; only the figures go through the formatter //
+    println!("╔════════════════════════════════════════════╗");
+    println!("║               COMMAND PAST                ║");
+    println!("╟────────────────────────────────────────────╢");
+    println!("║ {:<20} {:>12} ║", "Total commands:", total_commands.separate_with_commas());
+    println!("║ {:<20} {:>12} ║", "Unique commands:", unique_commands.separate_with_commas());
+    println!("║ {:<20} {:>12.1}% ║", "Command variety:", (unique_commands as f64 / total_commands as f64) * 100.0);
+    println!("╟────────────────────────────────────────────╢");
+    println!("║ {:<20} {:>12} ║", "Total keywords:", total_words.separate_with_commas());
+    println!("║ {:<20} {:>12} ║", "Unique keywords:", unique_words.separate_with_commas());
+    println!("║ {:<20} {:>12.1}% ║", "Keyword variety:", (unique_words as f64 / total_words as f64) * 100.0);
+    println!("╚════════════════════════════════════════════╝");
 }
 
 fn write_csv_output(filename: &str, records: &[Vec<String>]) -> Result<(), Box<dyn Error>> {
@@ -398,7 +505,13 @@ fn write_csv_output(filename: &str, records: &[Vec<String>]) -> Result<(), Box<d
     Ok(())
 }
 
-fn generate_detailed_csv(commands: &[String], words: &[String], category_counts: &HashMap<String, usize>) -> Vec<Vec<String>> {
+fn generate_detailed_csv(
+    commands: &[String],
+    words: &[String],
+    command_counts: &HashMap<&String, usize>,
+    word_counts: &HashMap<&String, usize>,
+    category_counts: &HashMap<&str, usize>
+) -> Vec<Vec<String>> {
     let mut records = Vec::new();
     
     // Header //
@@ -410,9 +523,9 @@ fn generate_detailed_csv(commands: &[String], words: &[String], category_counts:
     
     // Basic stats //
     let total_commands = commands.len();
-    let unique_commands = commands.iter().collect::<HashSet<_>>().len();
+    let unique_commands = command_counts.len();
     let total_words = words.len();
-    let unique_words = words.iter().collect::<HashSet<_>>().len();
+    let unique_words = word_counts.len();
     
     records.push(vec![
         "Total Commands".to_string(),
@@ -439,10 +552,7 @@ fn generate_detailed_csv(commands: &[String], words: &[String], category_counts:
     ]);
     
     // Command complexity (fairly arbitary) //
-    let cmd_lengths: Vec<usize> = commands.iter().map(|c| c.len()).collect();
-    let avg_length = cmd_lengths.iter().sum::<usize>() as f64 / total_commands as f64;
-    let max_length = *cmd_lengths.iter().max().unwrap_or(&0);
-    let min_length = *cmd_lengths.iter().min().unwrap_or(&0);
+    let (avg_length, min_length, max_length) = command_length_stats(commands);
     
     records.push(vec![
         "Average Command Length".to_string(),
@@ -467,12 +577,12 @@ fn generate_detailed_csv(commands: &[String], words: &[String], category_counts:
     
     let total_categories: usize = category_counts.values().sum();
     let mut sorted_categories: Vec<_> = category_counts.iter().collect();
-    sorted_categories.sort_by(|a, b| b.1.cmp(a.1));
+    sorted_categories.sort_unstable_by(|a, b| b.1.cmp(a.1));
     
     for (category, count) in sorted_categories {
         let percentage = (*count as f64 / total_categories as f64) * 100.0;
         records.push(vec![
-            category.clone(),
+            category.to_string(),
             count.to_string(),
             format!("{:.1}%", percentage)
         ]);
@@ -500,17 +610,22 @@ fn generate_search_csv(matching_commands: &[String], matching_words: &[String])
     records
 }
 
-fn generate_category_csv(matching_commands: &[String]) -> Vec<Vec<String>> {
+fn generate_category_csv(
+    matching_commands: &[String],
+    command_categories: &HashMap<&String, Vec<&'static str>>
+) -> Vec<Vec<String>> {
     let mut records = Vec::new();
     
     // Header //
     records.push(vec!["Category".to_string(), "Command".to_string()]);
     
-    // Group commands by category //
-    let mut categorized: HashMap<String, Vec<String>> = HashMap::new();
+    // Group commands by category, reusing the categories worked out in main //
+    let mut categorized: HashMap<&str, Vec<String>> = HashMap::new();
     for cmd in matching_commands {
-        let categories = categorize_command(cmd);
-        for cat in categories {
+        let categories = command_categories
+            .get(cmd)
+            .expect("category CSV requires every command to be categorized");
+        for &cat in categories {
             categorized.entry(cat).or_default().push(cmd.clone());
         }
     }
@@ -518,20 +633,27 @@ fn generate_category_csv(matching_commands: &[String]) -> Vec<Vec<String>> {
     // Add to records //
     for (category, commands) in categorized {
         for cmd in commands {
-            records.push(vec![category.clone(), cmd]);
+            records.push(vec![category.to_string(), cmd]);
         }
     }
     
     records
 }
 
-fn print_statistics(commands: &[String], words: &[String], category_counts: &HashMap<String, usize>, matches: &ArgMatches) {
+fn print_statistics(
+    commands: &[String],
+    words: &[String],
+    command_counts: &HashMap<&String, usize>,
+    word_counts: &HashMap<&String, usize>,
+    category_counts: &HashMap<&str, usize>,
+    matches: &ArgMatches
+) {
     if matches.is_present("json") {
         let result = json!({
             "commands": commands.len(),
-            "unique_commands": commands.iter().collect::<HashSet<_>>().len(),
+            "unique_commands": command_counts.len(),
             "words": words.len(),
-            "unique_words": words.iter().collect::<HashSet<_>>().len(),
+            "unique_words": word_counts.len(),
             "categories": category_counts
         });
         println!("{}", serde_json::to_string_pretty(&result).unwrap());
@@ -539,7 +661,7 @@ fn print_statistics(commands: &[String], words: &[String], category_counts: &Has
     }
 
     if matches.is_present("csv") {
-        let csv_data = generate_detailed_csv(commands, words, category_counts);
+        let csv_data = generate_detailed_csv(commands, words, command_counts, word_counts, category_counts);
         if let Err(e) = write_csv_output("command_history.csv", &csv_data) {
             eprintln!("Failed to write CSV: {}", e);
         }
@@ -547,21 +669,21 @@ fn print_statistics(commands: &[String], words: &[String], category_counts: &Has
     }
 
     if matches.is_present("bare") {
-        print_bare_stats(commands, words, category_counts);
+        print_bare_stats(commands, words, command_counts, word_counts, category_counts);
         return;
     }
 
     if matches.is_present("brief") {
-        print_brief_stats(commands, words);
+        print_brief_stats(commands, words, command_counts, word_counts);
         return;
     }
 
     if matches.is_present("detailed") {
-        print_detailed_analysis(commands, words, category_counts);
+        print_detailed_analysis(commands, words, command_counts, word_counts, category_counts);
         return;
     }
 
-    print_boxed_stats(commands, words);
+    print_boxed_stats(commands, words, command_counts, word_counts);
 }
 
 fn main() -> Result<(), Box<dyn Error>> {
@@ -632,28 +754,24 @@ fn main() -> Result<(), Box<dyn Error>> {
         eprintln!("Analyzing your command history...");
     }
 
-    let history_text = if let Some(file) = matches.value_of("file") {
-        let mut file = File::open(Path::new(file))?;
-        let mut contents = String::new();
-        file.read_to_string(&mut contents)?;
-        contents
+    let history: Box<dyn BufRead> = if let Some(file) = matches.value_of("file") {
+        let file = File::open(Path::new(file))?;
+        Box::new(BufReader::with_capacity(HISTORY_BUFFER_SIZE, file))
     } else {
         match get_shell_history() {
-            Ok(text) => text,
+            Ok(history) => history,
             Err(e) => {
                 if !quiet {
                     eprintln!("Failed to get live shell history ({}). Trying fallback method...", e);
                 }
                 let home = env::var("HOME")?;
-                let mut file = File::open(Path::new(&home).join(".bash_history"))?;
-                let mut contents = String::new();
-                file.read_to_string(&mut contents)?;
-                contents
+                let file = File::open(Path::new(&home).join(".bash_history"))?;
+                Box::new(BufReader::with_capacity(HISTORY_BUFFER_SIZE, file))
             }
         }
     };
 
-    let (commands, words) = process_bash_history(&history_text);
+    let (commands, words) = process_bash_history(history, !matches.is_present("interactive"))?;
 
     if commands.is_empty() {
         eprintln!("No valid commands found in the history.");
@@ -669,21 +787,41 @@ fn main() -> Result<(), Box<dyn Error>> {
         return Ok(());
     }
 
+    // Count commands and keywords once; every report reads these tallies //
+    let command_counts = count_occurrences(&commands);
+    let word_counts = count_occurrences(&words);
+
+    // The boxed and brief summaries never show categories, so only categorize when asked to.
+    // "category" must stay listed: the category search and CSV expect every command categorized //
+    let needs_categories = ["json", "csv", "bare", "detailed", "category"]
+        .iter()
+        .any(|arg| matches.is_present(arg));
+
+    // Categorize each distinct command once, weighted by how often it was run;
+    // the counts and the category search/CSV all read from this //
+    let mut command_categories: HashMap<&String, Vec<&'static str>> = HashMap::new();
     let mut category_counts = HashMap::new();
-    for cmd in &commands {
-        for category in categorize_command(cmd) {
-            *category_counts.entry(category).or_insert(0) += 1;
+    if needs_categories {
+        command_categories.reserve(command_counts.len());
+        for (&cmd, &count) in &command_counts {
+            let categories = categorize_command(cmd);
+            for &category in &categories {
+                *category_counts.entry(category).or_insert(0) += count;
+            }
+            command_categories.insert(cmd, categories);
         }
     }
 
-    print_statistics(&commands, &words, &category_counts, &matches);
+    print_statistics(&commands, &words, &command_counts, &word_counts, &category_counts, &matches);
 
     // Handle search operations //
     let case_sensitive = matches.is_present("case-sensitive");
     
     if let Some(pattern) = matches.value_of("search") {
-        let matching_commands = search_commands_by_keyword(&commands, pattern, case_sensitive);
-        let matching_words = search_words_by_keyword(&words, pattern, case_sensitive);
+        // One compiled pattern serves both the command and the keyword search //
+        let regex_pattern = build_search_regex(pattern, case_sensitive);
+        let matching_commands = search_commands_by_keyword(&commands, &regex_pattern);
+        let matching_words = search_words_by_keyword(&words, &regex_pattern);
         
         if matches.is_present("csv") {
             // Convert HashSet to Vec for CSV generation
@@ -694,23 +832,24 @@ fn main() -> Result<(), Box<dyn Error>> {
                 eprintln!("Failed to write CSV: {}", e);
             }
         } else {
-            print_keyword_search_results(&matching_commands, &matching_words);
+            print_keyword_search_results(&matching_commands, &matching_words)?;
         }
     } else if let Some(category_pattern) = matches.value_of("category") {
         let (matching_commands, matching_categories) = search_by_category(
             &commands,
             category_pattern,
             case_sensitive,
-            &category_counts
+            &category_counts,
+            &command_categories
         );
         
         if matches.is_present("csv") {
-            let csv_data = generate_category_csv(&matching_commands);
+            let csv_data = generate_category_csv(&matching_commands, &command_categories);
             if let Err(e) = write_csv_output("category_results.csv", &csv_data) {
                 eprintln!("Failed to write CSV: {}", e);
             }
         } else {
-            print_category_search_results(&matching_commands, &matching_categories);
+            print_category_search_results(&matching_commands, &matching_categories)?;
         }
     }
 
@@ -1,16 +1,21 @@
 // src/search.rs
 use std::collections::{HashSet, HashMap};
+use std::io::{self, BufWriter, Write};
 use regex::Regex;
 
-// Keyword search functions
-pub fn search_commands_by_keyword(commands: &[String], pattern: &str, case_sensitive: bool) -> Vec<String> {
-    let mut results = Vec::new();
-    let regex_pattern = if case_sensitive {
+// Compile a search pattern once so callers can share it across searches
+// (an invalid pattern falls back to matching everything)
+pub fn build_search_regex(pattern: &str, case_sensitive: bool) -> Regex {
+    if case_sensitive {
         Regex::new(pattern).unwrap_or_else(|_| Regex::new("").unwrap())
     } else {
         Regex::new(&format!("(?i){}", pattern)).unwrap_or_else(|_| Regex::new("").unwrap())
-    };
+    }
+}
 
+// Keyword search functions
+pub fn search_commands_by_keyword(commands: &[String], regex_pattern: &Regex) -> Vec<String> {
+    let mut results = Vec::new();
     for cmd in commands {
         if regex_pattern.is_match(cmd) {
             results.push(cmd.clone());
@@ -20,14 +25,8 @@ pub fn search_commands_by_keyword(commands: &[String], pattern: &str, case_sensi
     results
 }
 
-pub fn search_words_by_keyword(words: &[String], pattern: &str, case_sensitive: bool) -> HashSet<String> {
+pub fn search_words_by_keyword(words: &[String], regex_pattern: &Regex) -> HashSet<String> {
     let mut results = HashSet::new();
-    let regex_pattern = if case_sensitive {
-        Regex::new(pattern).unwrap_or_else(|_| Regex::new("").unwrap())
-    } else {
-        Regex::new(&format!("(?i){}", pattern)).unwrap_or_else(|_| Regex::new("").unwrap())
-    };
-
     for word in words {
         if regex_pattern.is_match(word) {
             results.insert(word.clone());
@@ -42,78 +41,84 @@ pub fn search_by_category(
     commands: &[String],
     category_pattern: &str,
     case_sensitive: bool,
-    category_counts: &HashMap<String, usize>
+    category_counts: &HashMap<&str, usize>,
+    command_categories: &HashMap<&String, Vec<&str>>
 ) -> (Vec<String>, Vec<String>) {
     let mut matching_commands = Vec::new();
     let mut matching_categories = Vec::new();
-    let regex_pattern = if case_sensitive {
-        Regex::new(category_pattern).unwrap_or_else(|_| Regex::new("").unwrap())
-    } else {
-        Regex::new(&format!("(?i){}", category_pattern)).unwrap_or_else(|_| Regex::new("").unwrap())
-    };
+    let regex_pattern = build_search_regex(category_pattern, case_sensitive);
 
     // Find matching categories
     for category in category_counts.keys() {
         if regex_pattern.is_match(category) {
-            matching_categories.push(category.clone());
+            matching_categories.push(category.to_string());
         }
     }
 
-    // Find commands that belong to matching categories
+    // Every category a command can get is a key of category_counts, so the pattern only needs
+    // testing once per category above; commands just look their categories up in that set
+    let category_set: HashSet<&str> = matching_categories.iter().map(String::as_str).collect();
+
+    // Find commands that belong to matching categories, using the categories main already computed
     for cmd in commands {
-        let categories = super::categorize_command(cmd);
-        for category in categories {
-            if regex_pattern.is_match(&category) {
-                matching_commands.push(cmd.clone());
-                break;
-            }
+        let categories = command_categories
+            .get(cmd)
+            .expect("category search requires every command to be categorized");
+        if categories.iter().any(|category| category_set.contains(category)) {
+            matching_commands.push(cmd.clone());
         }
     }
 
     (matching_commands, matching_categories)
 }
 
-// Print functions
-pub fn print_keyword_search_results(commands: &[String], words: &HashSet<String>) {
-    println!("\n\x1b[1;34m=== KEYWORD SEARCH RESULTS ===\x1b[0m");
+// Print functions (results can run to thousands of lines, so they go through one buffered stdout lock)
+pub fn print_keyword_search_results(commands: &[String], words: &HashSet<String>) -> io::Result<()> {
+    let mut out = BufWriter::new(io::stdout().lock());
+    writeln!(out, "\n\x1b[1;34m=== KEYWORD SEARCH RESULTS ===\x1b[0m")?;
     
     if !commands.is_empty() {
-        println!("\n\x1b[1mMatching Commands:\x1b[0m");
+        writeln!(out, "\n\x1b[1mMatching Commands:\x1b[0m")?;
         for (i, cmd) in commands.iter().enumerate() {
-            println!("{}. {}", i + 1, cmd);
+            writeln!(out, "{}. {}", i + 1, cmd)?;
         }
     }
     
     if !words.is_empty() {
-        println!("\n\x1b[1mMatching Keywords:\x1b[0m");
+        writeln!(out, "\n\x1b[1mMatching Keywords:\x1b[0m")?;
         for (i, word) in words.iter().enumerate() {
-            println!("{}. {}", i + 1, word);
+            writeln!(out, "{}. {}", i + 1, word)?;
         }
     }
     
     if commands.is_empty() && words.is_empty() {
-        println!("\nNo matches found.");
+        writeln!(out, "\nNo matches found.")?;
     }
+
+    out.flush()
 }
 
-pub fn print_category_search_results(commands: &[String], categories: &[String]) {
-    println!("\n\x1b[1;34m=== CATEGORY SEARCH RESULTS ===\x1b[0m");
+pub fn print_category_search_results(commands: &[String], categories: &[String]) -> io::Result<()> {
+    let mut out = BufWriter::new(io::stdout().lock());
+    writeln!(out, "\n\x1b[1;34m=== CATEGORY SEARCH RESULTS ===\x1b[0m")?;
     
     if !categories.is_empty() {
-        println!("\n\x1b[1mMatching Categories:\x1b[0m");
+        writeln!(out, "\n\x1b[1mMatching Categories:\x1b[0m")?;
         for (i, category) in categories.iter().enumerate() {
-            println!("{}. {}", i + 1, category);
+            writeln!(out, "{}. {}", i + 1, category)?;
         }
     }
     
     if !commands.is_empty() {
-        println!("\n\x1b[1mMatching Commands:\x1b[0m");
+        writeln!(out, "\n\x1b[1mMatching Commands:\x1b[0m")?;
         for (i, cmd) in commands.iter().enumerate() {
-            println!("{}. {}", i + 1, cmd);
+            writeln!(out, "{}. {}", i + 1, cmd)?;
         }
     }
     
     if commands.is_empty() && categories.is_empty() {
-        println!("\nNo matches found.");
+        writeln!(out, "\nNo matches found.")?;
     }
+
+    out.flush()
 }